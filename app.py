@@ -1,43 +1,137 @@
 # app.py - CareerInn-Tech (merged) - single-file Flask app
 # Save as app.py
-# Requirements: flask, sqlalchemy, werkzeug, groq (optional)
+# Requirements: flask, flask-caching, sqlalchemy, werkzeug, argon2-cffi, groq (optional), flask-compress (optional),
+#   flask-session + redis (optional, server-side sessions via SESSION_TYPE / REDIS_URL)
 # Run: python app.py
 # For production: set FLASK_SECRET_KEY and optionally DATABASE_URL and GROQ_API_KEY
 
+import hashlib
+import hmac
+import json
 import os
+import time
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 from data.btech_courses import IMPORTANT_BTECH_COURSES
 
+import click
 from flask import (
     Flask,
+    Response,
+    g,
+    make_response,
     request,
     redirect,
     session,
-    render_template_string,
     send_from_directory,
+    stream_with_context,
     url_for,
 )
+from flask.sessions import SecureCookieSessionInterface, SessionInterface
+from flask_caching import Cache
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from markupsafe import escape
 
 from sqlalchemy import (
-    create_engine, Column, Integer, String, Float, Text, Boolean
+    create_engine, Column, Integer, String, Float, Text, Boolean, Index,
+    insert, select, bindparam, literal, or_, event,
 )
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import declarative_base, sessionmaker, scoped_session
 
 # optional: GROQ client for AI — install only if you plan to use it
 try:
+    import httpx
     from groq import Groq
 except Exception:
     Groq = None
 
+# optional: argon2 password hashing (falls back to werkzeug pbkdf2 when missing)
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import VerificationError, InvalidHashError
+except Exception:
+    PasswordHasher = None
+
+# optional: gzip/brotli response compression
+try:
+    from flask_compress import Compress
+except Exception:
+    Compress = None
+
+# optional: server-side sessions (enabled with SESSION_TYPE, e.g. "redis")
+try:
+    from flask_session import Session
+except Exception:
+    Session = None
+
 # -------------------- CONFIG --------------------
+# asset paths never read the session, so don't verify/decode the signed cookie for them
+SESSIONLESS_PREFIXES = ("/static/", "/robots.txt", "/uploads/")
+
+class AssetSkippingSessionInterface(SecureCookieSessionInterface):
+    def open_session(self, app, request):
+        if request.path.startswith(SESSIONLESS_PREFIXES):
+            return None  # Flask falls back to a read-only null session
+        return super().open_session(app, request)
+
+class AssetSkippingServerSessionInterface(SessionInterface):
+    """Same asset skip for a Flask-Session backend, so assets never hit the store."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def open_session(self, app, request):
+        if request.path.startswith(SESSIONLESS_PREFIXES):
+            return None
+        return self.inner.open_session(app, request)
+
+    def save_session(self, app, session, response):
+        return self.inner.save_session(app, session, response)
+
 app = Flask(__name__)
 app.secret_key = os.getenv("FLASK_SECRET_KEY", "careerinn_tech_dev_secret")
+app.session_interface = AssetSkippingSessionInterface()
+if Session is not None and os.getenv("SESSION_TYPE"):
+    # chat histories then live server-side as JSON and the cookie only carries a
+    # session id, instead of re-sending and re-signing every turn
+    app.config["SESSION_TYPE"] = os.getenv("SESSION_TYPE")
+    app.config["SESSION_SERIALIZATION_FORMAT"] = "json"
+    # browser-session cookies, but stored chats still need a server-side expiry so
+    # abandoned conversations are dropped from the store
+    app.config["SESSION_PERMANENT"] = False
+    app.config["PERMANENT_SESSION_LIFETIME"] = 7 * 24 * 3600
+    if app.config["SESSION_TYPE"] == "redis" and os.getenv("REDIS_URL"):
+        import redis
+        app.config["SESSION_REDIS"] = redis.Redis.from_url(os.environ["REDIS_URL"])
+    Session(app)
+    app.session_interface = AssetSkippingServerSessionInterface(app.session_interface)
+
+# static files are cached by browsers for 30 days; BASE_HTML appends ?v=<asset_version>
+# so a deploy that changes them busts the cache
+app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 30 * 24 * 3600
+STATIC_FOLDER = os.path.join(os.path.dirname(__file__), "static")
+ASSET_VERSION = os.getenv("GIT_SHA") or os.getenv("RENDER_GIT_COMMIT") or str(
+    max((int(e.stat().st_mtime) for e in os.scandir(STATIC_FOLDER) if e.is_file()), default=0)
+)
+app.jinja_env.globals["asset_version"] = ASSET_VERSION[:12]
+
+# per-worker cache for content built from rarely-changing tables; only the page body is
+# cached, never the full response, since BASE_HTML renders the logged-in user's name
+cache = Cache(app, config={
+    "CACHE_TYPE": os.getenv("CACHE_TYPE", "SimpleCache"),
+    "CACHE_DEFAULT_TIMEOUT": 300,
+})
+if Compress is not None:
+    # compressing a streamed response buffers all of it first, which defeats streaming
+    app.config["COMPRESS_STREAMS"] = False
+    Compress(app)
 
 # uploads folder (kept but prev-paper upload disabled)
 UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), "uploads")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-ALLOWED_EXTENSIONS = {"pdf"}
+ALLOWED_EXTENSIONS = frozenset({"pdf"})
+_ALLOWED_SUFFIXES = tuple("." + ext for ext in ALLOWED_EXTENSIONS)
 
 from flask import send_from_directory
 
@@ -46,19 +140,115 @@ def robots_txt():
     return send_from_directory("static", "robots.txt", mimetype="text/plain")
 
 def allowed_file(filename):
-    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(_ALLOWED_SUFFIXES)
 
 # -------------------- GROQ HELPER --------------------
+# one client per worker so its httpx pool keeps TLS connections to the API alive
+# between chat messages instead of handshaking on every request
+_groq_client = None
+
 def get_groq_client():
-    api_key = os.environ.get("GROQ_API_KEY")
-    if not api_key or Groq is None:
-        return None
-    return Groq(api_key=api_key)
+    global _groq_client
+    if _groq_client is None:
+        api_key = os.environ.get("GROQ_API_KEY")
+        if not api_key or Groq is None:
+            return None
+        _groq_client = Groq(
+            api_key=api_key,
+            http_client=httpx.Client(
+                timeout=30,
+                limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60),
+            ),
+        )
+    return _groq_client
+
+AI_MODEL = "llama-3.1-8b-instant"
+AI_TEMPERATURE = 0.7
+AI_REPLY_CACHE_TIMEOUT = 3600
+
+def normalize_user_text(text):
+    # "Hi", "hi " and "hi!" ask the same thing; fold case, whitespace and trailing
+    # punctuation so near-duplicate user turns share one cached reply
+    return " ".join(text.split()).casefold().rstrip("?!. ")
+
+def ai_reply_cache_key(messages):
+    # key over everything that shapes the reply, with user turns normalized; common
+    # openers ("start", "hi", the same starter question) then skip the API entirely
+    keyed = [
+        {**m, "content": normalize_user_text(m["content"])} if m.get("role") == "user" else m
+        for m in messages
+    ]
+    payload = json.dumps([AI_MODEL, AI_TEMPERATURE, keyed], ensure_ascii=False, sort_keys=True)
+    return "ai-reply:" + hashlib.sha256(payload.encode()).hexdigest()
+
+# per-worker reply cache counters, reported with each Groq usage log line
+_ai_reply_cache_stats = {"hits": 0, "misses": 0}
+
+def get_cached_reply(key):
+    reply = cache.get(key)
+    _ai_reply_cache_stats["hits" if reply is not None else "misses"] += 1
+    return reply
+
+def _usage_field(obj, name):
+    # newer API fields arrive as pydantic extras, which may be plain dicts
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+def log_ai_usage(usage):
+    # cached_tokens shows how much of the prompt hit Groq's prefix cache; keeping the
+    # system prompt first and byte-identical across requests is what makes it hit
+    if usage is None:
+        return
+    details = _usage_field(usage, "prompt_tokens_details")
+    app.logger.info(
+        "groq usage: prompt_tokens=%s cached_tokens=%s completion_tokens=%s "
+        "reply_cache_hits=%d reply_cache_misses=%d",
+        _usage_field(usage, "prompt_tokens"),
+        _usage_field(details, "cached_tokens") or 0,
+        _usage_field(usage, "completion_tokens"),
+        _ai_reply_cache_stats["hits"],
+        _ai_reply_cache_stats["misses"],
+    )
+
+def cached_completion(groq_client, messages):
+    key = ai_reply_cache_key(messages)
+    reply = get_cached_reply(key)
+    if reply is None:
+        resp = groq_client.chat.completions.create(model=AI_MODEL, messages=messages, temperature=AI_TEMPERATURE)
+        log_ai_usage(getattr(resp, "usage", None))
+        reply = resp.choices[0].message.content
+        cache.set(key, reply, timeout=AI_REPLY_CACHE_TIMEOUT)
+    return reply
 
 # -------------------- DB SETUP --------------------
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///careerinn_tech.db")
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
-SessionLocal = scoped_session(sessionmaker(bind=engine, autoflush=False, autocommit=False))
+# one pooled engine per worker; LIFO checkout keeps reusing the warmest connection
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=10,
+    max_overflow=20,
+    pool_pre_ping=True,
+    # retire connections before server-side idle timeouts (MySQL/pgbouncer) drop them
+    pool_recycle=1800,
+    pool_use_lifo=True,
+)
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_conn, _record):
+        # WAL lets readers keep going while a request writes; NORMAL sync is safe under WAL
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
+
+# request-scoped session: views share one session per request and
+# shutdown_session() returns its connection to the pool on teardown
+SessionLocal = scoped_session(
+    sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+)
 Base = declarative_base()
 
 # -------------------- MODELS --------------------
@@ -88,6 +278,9 @@ class College(Base):
     track = Column(String(50), nullable=False)  # 'btech' or 'hospitality'
     eamcet_cutoff = Column(Integer, nullable=True)
 
+    # matches /colleges: equality on track, range filters on rating/fees, ORDER BY rating DESC
+    __table_args__ = (Index("ix_colleges_track_rating_fees", track, rating.desc(), fees),)
+
 
 class Mentor(Base):
     __tablename__ = "mentors"
@@ -180,15 +373,45 @@ class Project(Base):
 
 
 # -------------------- DB INIT & SEED --------------------
+# bump when tables or seed data change so existing SQLite files get re-seeded
+SCHEMA_VERSION = 2
+
 def get_db():
+    # the request's scoped session: every call in a request returns the same one, and
+    # shutdown_session() removes it on teardown, so views never close it themselves
     return SessionLocal()
 
+# one SELECT of per-table EXISTS subqueries for the seed checks, built once so the
+# engine's compiled cache is hit; EXISTS stops at the first row where COUNT(*) would
+# scan the whole table, and all answers come back in a single round trip
+SEEDED_MODELS = (Course, College, Skill, Mentor, Job, MockInterview, PrevPaper, Project)
+_SEED_EXISTS_STMT = select(*(select(m.id).exists() for m in SEEDED_MODELS))
+
+def seeded_tables(db):
+    return dict(zip(SEEDED_MODELS, db.execute(_SEED_EXISTS_STMT).one()))
+
+def db_is_current():
+    # SQLite keeps user_version in the file header, so this is a single cheap read;
+    # other backends always fall through to the (idempotent) init_db checks
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar() >= SCHEMA_VERSION
+
 def init_db():
     db = get_db()
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so add indexes introduced later explicitly
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    seeded = seeded_tables(db)
+    # model -> list of row dicts, written below as one executemany INSERT per table
+    # instead of constructing and flushing an ORM instance per row
+    seed_rows = {}
 
     # Seed sample courses (BTech + Hospitality)
-    if db.query(Course).count() == 0:
+    if not seeded[Course]:
         courses = [
             ("Intro to Programming (CSE)", "Learn basics of programming for B.Tech CSE students.", "https://www.example.com/video_intro_prog.mp4", "btech"),
             ("Data Structures & Algorithms", "Essential DSA course for placements.", "https://www.example.com/video_dsa.mp4", "btech"),
@@ -197,11 +420,12 @@ def init_db():
             ("Food & Beverage Service", "F&B service etiquette and practice.", "https://www.example.com/video_fb.mp4", "hospitality"),
             ("Kitchen Hygiene & Safety (HACCP)", "Food safety basics for hospitality.", "https://www.example.com/video_haccp.mp4", "hospitality"),
         ]
-        for t, d, v, tr in courses:
-            db.add(Course(title=t, description=d, video_link=v, track=tr))
+        seed_rows[Course] = [
+            dict(title=t, description=d, video_link=v, track=tr) for t, d, v, tr in courses
+        ]
 
     # Seed colleges for both tracks
-    if db.query(College).count() == 0:
+    if not seeded[College]:
         colleges_seed = [
             # Hospitality
             ("IHM Hyderabad (IHMH)", "DD Colony, Hyderabad", 320000, "BSc Hospitality & Hotel Admin", 4.6, "hospitality"),
@@ -229,6 +453,7 @@ def init_db():
 
             
         ]
+        college_rows = seed_rows[College] = []
         for item in colleges_seed:
             if len(item) == 6:
                 name, loc, fees, course, rating, track = item
@@ -236,8 +461,8 @@ def init_db():
             else:
                 name, loc, fees, course, rating, track, cutoff = item
         
-            db.add(
-                College(
+            college_rows.append(
+                dict(
                     name=name,
                     location=loc,
                     fees=fees,
@@ -249,7 +474,7 @@ def init_db():
             )
 
     # Seed skills (BTech + Hospitality)
-    if db.query(Skill).count() == 0:
+    if not seeded[Skill]:
         skills_seed = [
             # -------- BTECH --------
             ("btech", "CSE", "Python Programming", "/static/skills/python.mp4"),
@@ -272,50 +497,49 @@ def init_db():
             ("hospitality", "Kitchen", "Continental Cooking", "/static/skills/continental.mp4"),
         ]
     
-        for track, category, name, video in skills_seed:
-            db.add(
-                Skill(
-                    track=track,
-                    category=category,
-                    name=name,
-                    video_link=video
-                )
-            )
+        seed_rows[Skill] = [
+            dict(track=track, category=category, name=name, video_link=video)
+            for track, category, name, video in skills_seed
+        ]
 
 
 
     # Mentors
-    if db.query(Mentor).count() == 0:
+    if not seeded[Mentor]:
         mentors = [
             ("Anita Rao", "15 years in luxury hotel operations", "Hotel Ops / Front Office"),
             ("Rohit Verma", "Ex-Accor chef and culinary trainer", "Culinary / F&B"),
             ("Dr. Priya Singh", "Professor of CSE with industry mentorship", "BTech - Placements / Projects"),
         ]
-        for n, e, s in mentors:
-            db.add(Mentor(name=n, experience=e, speciality=s))
+        seed_rows[Mentor] = [dict(name=n, experience=e, speciality=s) for n, e, s in mentors]
 
     # Jobs
-    if db.query(Job).count() == 0:
+    if not seeded[Job]:
         jobs = [
             ("Management Trainee - Front Office", "Taj Group", "Hyderabad", "₹3.5–5 LPA", "hospitality"),
             ("Commis 1 - Kitchen", "ITC Hotels", "Bengaluru", "₹2.5–3.5 LPA", "hospitality"),
             ("Software Engineer - New Grad", "Tech startup", "Hyderabad", "₹6–8 LPA", "btech"),
             ("Embedded Systems Intern", "IoT Co.", "Bengaluru", "Stipend", "btech"),
         ]
-        for t, c, loc, sal, tr in jobs:
-            db.add(Job(title=t, company=c, location=loc, salary=sal, track=tr))
+        seed_rows[Job] = [
+            dict(title=t, company=c, location=loc, salary=sal, track=tr) for t, c, loc, sal, tr in jobs
+        ]
 
     # Mock interviews
-    if db.query(MockInterview).count() == 0:
-        db.add(MockInterview(title="Front Office Mock - Common Questions", notes="Guest complains about late check-in; practice handling the situation.", link="", uploader_id=None))
-        db.add(MockInterview(title="BTech - Coding Round Mock", notes="Practice with common DS & Algo questions for placements.", link="", uploader_id=None))
+    if not seeded[MockInterview]:
+        seed_rows[MockInterview] = [
+            dict(title="Front Office Mock - Common Questions", notes="Guest complains about late check-in; practice handling the situation.", link="", uploader_id=None),
+            dict(title="BTech - Coding Round Mock", notes="Practice with common DS & Algo questions for placements.", link="", uploader_id=None),
+        ]
 
     # Prev papers - view-only external links (no uploads)
-    if db.query(PrevPaper).count() == 0:
-        db.add(PrevPaper(title="NCHM JEE - Past Papers (Aglasem)", year="all", link="https://admission.aglasem.com/nchmct-jee-question-paper/", uploader_id=None, is_upload=False))
-        db.add(PrevPaper(title="IIIT Hyderabad Sample Papers", year="recent", link="https://www.iiit.ac.in/admissions/sample-papers", uploader_id=None, is_upload=False))
+    if not seeded[PrevPaper]:
+        seed_rows[PrevPaper] = [
+            dict(title="NCHM JEE - Past Papers (Aglasem)", year="all", link="https://admission.aglasem.com/nchmct-jee-question-paper/", uploader_id=None, is_upload=False),
+            dict(title="IIIT Hyderabad Sample Papers", year="recent", link="https://www.iiit.ac.in/admissions/sample-papers", uploader_id=None, is_upload=False),
+        ]
     # -------------------- SAMPLE PROJECTS --------------------
-    if db.query(Project).count() == 0:
+    if not seeded[Project]:
     
         # BTECH PROJECTS
         btech_projects = [
@@ -336,8 +560,9 @@ def init_db():
             ),
         ]
     
+        project_rows = seed_rows[Project] = []
         for title, desc, tech in btech_projects:
-            db.add(Project(
+            project_rows.append(dict(
                 user_id=None,
                 title=title,
                 description=desc,
@@ -366,7 +591,7 @@ def init_db():
         ]
     
         for title, desc, tech in hospitality_projects:
-            db.add(Project(
+            project_rows.append(dict(
                 user_id=None,
                 title=title,
                 description=desc,
@@ -375,20 +600,37 @@ def init_db():
                 is_sample=True
             ))
 
+    for model, rows in seed_rows.items():
+        db.execute(insert(model), rows)
     db.commit()
-    db.close()
+    # init_db runs outside a request (import / CLI), so no teardown will clean up for it
+    SessionLocal.remove()
+
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+@app.cli.command("init-db")
+def init_db_command():
+    """Create tables and seed sample data."""
+    init_db()
+    click.echo("Database initialized.")
 
 @app.teardown_appcontext
 def shutdown_session(exception=None):
     SessionLocal.remove()
 
-# initialize DB
-init_db()
+# initialize DB (skipped on worker boot once the SQLite file is up to date)
+if not db_is_current():
+    init_db()
 
 # -------------------- AI SYSTEM PROMPT --------------------
+# system prompts go first and are never interpolated, so every request shares the same
+# leading tokens and Groq's prompt-prefix cache can reuse them
 AI_SYSTEM_PROMPT = """
 You are CareerInn-Tech's AI career guide. Talk like a friendly senior mentor, ask structured questions and give short actionable advice.
 """
+MOCK_AI_SYSTEM_PROMPT = "You are an AI mock interviewer. Ask scenario questions, give feedback."
 
 # -------------------- BASE TEMPLATE (simplified top nav) --------------------
 BASE_HTML = """
@@ -399,7 +641,8 @@ BASE_HTML = """
   <title>{{ title or "CareerInnTech" }}</title>
   <meta name="viewport" content="width=device-width, initial-scale=1">
   <script src="https://cdn.tailwindcss.com"></script>
-  <link rel="stylesheet" href="/static/style.css">
+  <link rel="stylesheet" href="/static/style.css?v={{ asset_version }}">
+  <link rel="stylesheet" href="/static/ai-fab.css?v={{ asset_version }}">
   <style>
     /* Larger UI sizes and basic styling tweaks */
     body { font-family: Inter, ui-sans-serif, system-ui, -apple-system, "Segoe UI", Roboto, "Helvetica Neue", Arial; }
@@ -411,12 +654,6 @@ BASE_HTML = """
     .table th, .table td { padding:10px 8px; border-bottom:1px solid rgba(255,255,255,0.04); text-align:left; }
     .input-box { width:100%; padding:10px 12px; border-radius:8px; background:#071028; color:#e6eef6; border:1px solid rgba(255,255,255,0.04); }
     .submit-btn { padding:10px 14px; border-radius:10px; background:#6366f1; color:white; font-weight:600; }
-    .ai-fab { position: fixed; right: 22px; bottom: 22px; z-index: 2000; width:92px; height:92px; border-radius:999px; display:flex; align-items:center; justify-content:center; font-size:36px; cursor:pointer; box-shadow:0 25px 60px rgba(16,185,129,0.12); }
-    .ai-fab .emoji { display:inline-block; transform-origin:center; animation: float 3s ease-in-out infinite, rotate 6s linear infinite; }
-    @keyframes float { 0%{transform:translateY(0)}50%{transform:translateY(-10px)}100%{transform:translateY(0)} }
-    @keyframes rotate { 0%{transform:rotate(0deg)}100%{transform:rotate(360deg)} }
-    .ai-modal { position: fixed; right: 26px; bottom: 130px; width:520px; max-width:94%; background:#041025; border-radius:14px; box-shadow:0 30px 60px rgba(2,6,23,0.75); padding:18px; display:none; z-index:2001; }
-    .ai-modal .btn { padding:10px 12px; border-radius:10px; display:inline-block; }
     nav a { margin-left:10px; color:#dbeafe; font-weight:600; }
     .logo-txt { font-weight:700; font-size:16px; }
   </style>
@@ -428,7 +665,7 @@ BASE_HTML = """
 
     <!-- LOGO GOES HERE -->
     <div class="w-12 h-12 rounded-2xl bg-slate-900 overflow-hidden flex items-center justify-center">
-      <img src="/static/logo.png"
+      <img src="/static/logo.png?v={{ asset_version }}"
            class="w-[140%] h-[140%] object-contain"
            alt="CareerInnTech">
     </div>
@@ -481,30 +718,160 @@ BASE_HTML = """
   </div>
 </div>
 
-<script>
-  const aiFab = document.getElementById('aiFab');
-  const aiModal = document.getElementById('aiModal');
-  const closeAi = document.getElementById('closeAi');
-  aiFab.addEventListener('click', ()=> aiModal.style.display = 'block');
-  closeAi.addEventListener('click', ()=> aiModal.style.display = 'none');
-  window.addEventListener('click', (e)=> { if(e.target === aiModal) aiModal.style.display='none'; });
-</script>
+<script defer src="/static/ai-fab.js?v={{ asset_version }}"></script>
 
 </body>
 </html>
 """
 
+# compiled once; render_template_string would re-hash the source and hit Jinja's
+# template cache (and run context processors) on every response
+BASE_TEMPLATE = app.jinja_env.from_string(BASE_HTML)
+
 def render_page(content_html, title="CareerInnTech"):
-    return render_template_string(BASE_HTML, content=content_html, title=title)
+    return BASE_TEMPLATE.render(content=content_html, title=title, session=session)
+
+_CONTENT_SLOT = "\x00content\x00"
+STREAM_FLUSH_BYTES = 8192
+
+def render_page_stream(body_chunks, title="CareerInnTech"):
+    # send the nav as soon as it's ready, then the body as it is generated, instead of
+    # holding the whole page in memory; small template chunks are batched per write
+    head, tail = render_page(_CONTENT_SLOT, title).split(_CONTENT_SLOT, 1)
+
+    def generate():
+        yield head
+        buf, size = [], 0
+        for chunk in body_chunks:
+            buf.append(chunk)
+            size += len(chunk)
+            if size >= STREAM_FLUSH_BYTES:
+                yield "".join(buf)
+                buf, size = [], 0
+        buf.append(tail)
+        yield "".join(buf)
+
+    return Response(stream_with_context(generate()), mimetype="text/html")
+
+# (title, content) -> fully rendered page for logged-out visitors; static pages only
+# differ by the user's name in the nav, so anonymous hits can share one rendering.
+# content is always a string literal, so its hash is computed once and the key set is fixed
+_ANON_PAGE_CACHE = {}
+
+def render_static_page(content_html, title):
+    if session.get("user"):
+        return render_page(content_html, title)
+    key = (title, content_html)
+    page = _ANON_PAGE_CACHE.get(key)
+    if page is None:
+        page = _ANON_PAGE_CACHE[key] = render_page(content_html, title)
+    return page
 
 # -------------------- helpers --------------------
+def request_cached(key, loader, *args):
+    # memoize a lookup for the rest of the current request; write paths call
+    # clear_request_cache() so a later read in the same request sees the change
+    cache = g.setdefault("_query_cache", {})
+    if key not in cache:
+        cache[key] = loader(*args)
+    return cache[key]
+
+def prime_request_cache(key, value):
+    # seed a lookup the view already has in hand, so request_cached() won't re-query it
+    g.setdefault("_query_cache", {})[key] = value
+
+def clear_request_cache():
+    g.pop("_query_cache", None)
+
+# module-level loaders for request_cached(), so call sites don't build a closure per request
+def load_profile(user_id):
+    return get_db().query(UserProfile).filter_by(user_id=user_id).first()
+
+def load_ai_usage(user_id):
+    return get_db().query(AiUsage).filter_by(user_id=user_id).first()
+
+# existence probe for the gate check: no ORM row is built, just 1 or None
+STMT_SUBSCRIPTION_ACTIVE = (
+    select(literal(1))
+    .where(Subscription.user_id == bindparam("user_id"), Subscription.active.is_(True))
+    .limit(1)
+)
+
+def load_subscription_active(user_id):
+    return get_db().execute(STMT_SUBSCRIPTION_ACTIVE, {"user_id": user_id}).scalar()
+
+def ai_chat_used(user_id):
+    # the free-chat flag only ever flips to used, so trust the session once it says so
+    if session.get("ai_used"):
+        return True
+    usage = request_cached(("aiuse", user_id), load_ai_usage, user_id)
+    used = bool(usage and usage.ai_used >= 1)
+    if used:
+        session["ai_used"] = True
+    return used
+
+# INSERT ... ON CONFLICT builders for the dialects that support it
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+def upsert_by_user(db, model, **values):
+    # one round trip instead of SELECT-then-INSERT/UPDATE; relies on the
+    # UNIQUE user_id column shared by the per-user tables
+    dialect_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        row = db.query(model).filter_by(user_id=values["user_id"]).first()
+        if row is None:
+            db.add(model(**values))
+        else:
+            for key, value in values.items():
+                setattr(row, key, value)
+        return
+    stmt = dialect_insert(model).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={key: value for key, value in values.items() if key != "user_id"},
+    )
+    db.execute(stmt)
+
+# by default chat histories live in the signed session cookie, which is re-sent and
+# re-signed on every request (and silently dropped by browsers past ~4 KB), so keep
+# only the tail; SESSION_TYPE moves them server-side but the cap still bounds prompts
+HISTORY_MAX_MESSAGES = 20
+HISTORY_KEEP_AFTER_TRIM = 10
+
+def trim_history(history):
+    # drop old turns in blocks rather than one per message: a sliding window shifts
+    # the prompt every turn, which defeats Groq's prefix cache on everything after
+    # the system prompt; block trimming keeps each prompt a prefix of the next
+    if len(history) > HISTORY_MAX_MESSAGES:
+        return history[-HISTORY_KEEP_AFTER_TRIM:]
+    return history
+
+# user_id -> expiry; only active subscriptions are cached, since /subscribe on
+# another gunicorn worker can't invalidate this process and a stale "no" would lock users out
+_SUBSCRIBED_CACHE = {}
+SUBSCRIBED_CACHE_TTL = 60
+SUBSCRIBED_CACHE_MAX = 10000
+
 def user_is_subscribed(user_id):
     if not user_id:
         return False
-    db = get_db()
-    s = db.query(Subscription).filter_by(user_id=user_id).first()
-    db.close()
-    return bool(s and s.active)
+    # subscriptions are never revoked, so a "yes" remembered in the signed cookie stays
+    # true for the whole login; "no" is never stored so subscribing elsewhere isn't masked
+    if session.get("is_subscribed") and session.get("user_id") == user_id:
+        return True
+    expires = _SUBSCRIBED_CACHE.get(user_id)
+    if expires is not None and expires > time.monotonic():
+        return True
+    active = request_cached(("sub", user_id), load_subscription_active, user_id)
+    if active:
+        if session.get("user_id") == user_id:
+            session["is_subscribed"] = True
+        if len(_SUBSCRIBED_CACHE) >= SUBSCRIBED_CACHE_MAX:
+            _SUBSCRIBED_CACHE.clear()
+        _SUBSCRIBED_CACHE[user_id] = time.monotonic() + SUBSCRIBED_CACHE_TTL
+    else:
+        _SUBSCRIBED_CACHE.pop(user_id, None)
+    return bool(active)
 
 @app.route("/landing")
 def landing():
@@ -585,7 +952,7 @@ def landing():
       </div>
     </div>
     """
-    return render_page(content, "CareerInnTech")
+    return render_static_page(content, "CareerInnTech")
 
 
 
@@ -605,27 +972,16 @@ def home_logged_in():
         return redirect("/landing")
 
     user_id = session.get("user_id")
-    logged_in = True
-    db = get_db()
-    profile = db.query(UserProfile).filter_by(user_id=user_id).first()
-    db.close()
+    profile = request_cached(("prof", user_id), load_profile, user_id)
     
-    show_complete_registration = profile and not profile.onboarded
+    show_complete_registration = bool(profile and not profile.onboarded)
 
+    ai_used = ai_chat_used(user_id)
 
+    return render_page(home_content(ai_used, show_complete_registration), "CareerInnTech | Home")
 
-
-
-    # CTA text: one free AI chat then subscribe 499
-    cta_html = ""
-
-    if logged_in:
-        db = get_db()
-        usage = db.query(AiUsage).filter_by(user_id=user_id).first()
-        db.close()
-    
-        if usage and usage.ai_used >= 1:
-            cta_html = """
+# CTA text: one free AI chat then subscribe 499
+HOME_CTA_AI_USED = """
             <a href="/subscribe" class="primary-cta">
               Get Started – ₹499 / year
             </a>
@@ -633,8 +989,7 @@ def home_logged_in():
               Your free AI chat expired. Subscribe for unlimited access.
             </p>
             """
-        else:
-            cta_html = """
+HOME_CTA_AI_FREE = """
             <a href="/chatbot" class="primary-cta">
               Start your free AI chat
             </a>
@@ -642,10 +997,7 @@ def home_logged_in():
               Every user gets one free full AI chat. Subscribe afterwards for unlimited access.
             </p>
             """
-    
-        # 🔴 ADD REGISTRATION WARNING (THIS IS NEW)
-        if show_complete_registration:
-            cta_html += """
+HOME_REGISTRATION_WARNING = """
             <div class="mt-6">
               <a href="/onboarding"
                  class="px-6 py-3 rounded-xl bg-rose-600 font-semibold block text-center">
@@ -656,16 +1008,13 @@ def home_logged_in():
               </p>
             </div>
             """
-    else:
-        cta_html = """
-        <a href="/signup" class="primary-cta">
-          Create free account
-        </a>
-        <p class="text-sm text-slate-400 mt-2">
-          Signup to get one free AI chat.
-        </p>
-        """
 
+# the body only varies with these two flags, so each variant is built once and cached
+@cache.memoize(timeout=600)
+def home_content(ai_used, show_complete_registration):
+    cta_html = HOME_CTA_AI_USED if ai_used else HOME_CTA_AI_FREE
+    if show_complete_registration:
+        cta_html += HOME_REGISTRATION_WARNING
 
     content = f"""
     <div class="max-w-6xl mx-auto space-y-8">
@@ -785,7 +1134,7 @@ def home_logged_in():
 
     </div>
     """
-    return render_page(content, "CareerInnTech | Home")
+    return content
 
 # -------------------- ABOUT/CONTACT/SUPPORT --------------------
 @app.route("/about")
@@ -796,7 +1145,7 @@ def about():
       <p class="text-sm text-slate-300">CareerInnTech integrates hospitality and BTech career guidance into one single student-first platform. Personalized roadmaps, mentor connect, project bank, and AI-powered practice.</p>
     </div>
     """
-    return render_page(content, "About")
+    return render_static_page(content, "About")
 
 @app.route("/contact")
 def contact():
@@ -806,7 +1155,7 @@ def contact():
       <p class="text-sm text-slate-300">Email: support@careerinntech.com</p>
     </div>
     """
-    return render_page(content, "Contact")
+    return render_static_page(content, "Contact")
 
 @app.route("/support")
 def support():
@@ -816,9 +1165,50 @@ def support():
       <p class="text-sm text-slate-300">Need help? Reach out at support@careerinn-tech.com</p>
     </div>
     """
-    return render_page(content, "Support")
+    return render_static_page(content, "Support")
 
 # -------------------- COURSES --------------------
+# list queries are module-level select()s so each view reuses one statement object
+# and the engine's compiled cache instead of building an ORM Query per request; they
+# select only the rendered columns, so rows come back as plain tuples rather than
+# mapped instances tracked in the identity map
+STMT_COURSES_BY_TRACK = select(Course.title, Course.description, Course.video_link).where(
+    Course.track == bindparam("track")
+)
+
+# list pages render through templates compiled once at import; Jinja autoescapes every
+# {{ value }}, so DB and user text can't inject markup
+COURSES_TEMPLATE = app.jinja_env.from_string("""
+    <div class="max-w-5xl mx-auto">
+      <h2 class="text-2xl font-bold mb-3">
+        Courses & Skills — {{ 'BTech' if track == 'btech' else 'Hospitality' }}
+      </h2>
+
+      <div class="grid md:grid-cols-2 gap-4">
+        {% for c in courses %}
+        <div class='support-box mb-3'>
+          <h3 class='font-semibold'>{{ c.title }}</h3>
+          <p class='text-sm text-slate-300'>{{ c.description or '' }}</p>
+          <div class='mt-2'>{% if c.video_link %}<a href='{{ c.video_link }}' target='_blank' class='text-indigo-300 underline text-sm'>Watch video</a>{% endif %}</div>
+        </div>
+        {% endfor %}
+      </div>
+
+
+      <div class="mt-4">
+        <a href="/" class="px-3 py-1 rounded bg-indigo-600">Back</a>
+      </div>
+    </div>
+""")
+
+@cache.memoize(timeout=600)
+def courses_content(track):
+    # Step 2: Fetch courses + skills
+    db = get_db()
+    courses_data = db.execute(STMT_COURSES_BY_TRACK, {"track": track}).all()
+
+    return COURSES_TEMPLATE.render(track=track, courses=courses_data)
+
 @app.route("/courses", methods=["GET", "POST"])
 def courses():
     track = request.args.get("track")
@@ -835,49 +1225,9 @@ def courses():
           </div>
         </div>
         """
-        return render_page(content, "Courses")
-
-    # Step 2: Fetch courses + skills
-    db = get_db()
-    courses_data = db.query(Course).filter_by(track=track).all()
-    db.close()
-
-    # Step 3: Build course cards
-    cards = ""
-    for c in courses_data:
-        video = (
-            f"<a href='{c.video_link}' target='_blank' "
-            f"class='text-indigo-300 underline text-sm'>Watch video</a>"
-            if c.video_link else ""
-        )
-        cards += f"""
-        <div class='support-box mb-3'>
-          <h3 class='font-semibold'>{c.title}</h3>
-          <p class='text-sm text-slate-300'>{c.description or ''}</p>
-          <div class='mt-2'>{video}</div>
-        </div>
-        """
-
-
-    # Step 5: Final page render
-    content = f"""
-    <div class="max-w-5xl mx-auto">
-      <h2 class="text-2xl font-bold mb-3">
-        Courses & Skills — {'BTech' if track=='btech' else 'Hospitality'}
-      </h2>
-
-      <div class="grid md:grid-cols-2 gap-4">
-        {cards}
-      </div>
+        return render_static_page(content, "Courses")
 
-
-      <div class="mt-4">
-        <a href="/" class="px-3 py-1 rounded bg-indigo-600">Back</a>
-      </div>
-    </div>
-    """
-
-    return render_page(content, "Courses")
+    return render_page(courses_content(track), "Courses")
 
 # -------------------- SKILLS (SEPARATE + FILTERED) --------------------
 
@@ -913,44 +1263,18 @@ def save_skill_progress():
     progress.notes = notes
 
     db.commit()
-    db.close()
 
     return redirect(f"/skills?track={track}&category={category}")
 
 
-@app.route("/projects")
-def projects():
-    if "user_id" not in session:
-        return redirect("/login")
-
-    track = request.args.get("track", "btech")  # default btech
-    user_id = session["user_id"]
-
-    db = get_db()
-
-    projects = db.query(Project).filter(
-        Project.track == track,
-        (Project.is_sample == True) | (Project.user_id == user_id)
-    ).all()
-
-    db.close()
-
-    cards = ""
-    for p in projects:
-        tag = "<span class='text-xs text-emerald-400'>(Sample)</span>" if p.is_sample else ""
-        cards += f"""
-        <div class="support-box">
-          <h3 class="font-semibold">
-            {p.title} {tag}
-          </h3>
-          <p class="text-sm text-slate-300 mt-1">{p.description or ""}</p>
-          <p class="text-xs text-indigo-300 mt-1">
-            Tech: {p.tech_stack or "-"}
-          </p>
-        </div>
-        """
+STMT_PROJECTS_FOR_USER = select(
+    Project.title, Project.description, Project.tech_stack, Project.is_sample
+).where(
+    Project.track == bindparam("track"),
+    or_(Project.is_sample == True, Project.user_id == bindparam("user_id")),
+)
 
-    content = f"""
+PROJECTS_TEMPLATE = app.jinja_env.from_string("""
     <div class="max-w-6xl mx-auto space-y-6">
 
       <h1 class="text-2xl font-bold">Projects</h1>
@@ -970,19 +1294,48 @@ def projects():
 
       <!-- PROJECT LIST -->
       <div class="grid md:grid-cols-2 gap-4">
-        {cards if cards else "<p class='text-slate-400'>No projects yet.</p>"}
+        {% for p in projects %}
+        <div class="support-box">
+          <h3 class="font-semibold">
+            {{ p.title }} {% if p.is_sample %}<span class='text-xs text-emerald-400'>(Sample)</span>{% endif %}
+          </h3>
+          <p class="text-sm text-slate-300 mt-1">{{ p.description or "" }}</p>
+          <p class="text-xs text-indigo-300 mt-1">
+            Tech: {{ p.tech_stack or "-" }}
+          </p>
+        </div>
+        {% else %}
+        <p class='text-slate-400'>No projects yet.</p>
+        {% endfor %}
       </div>
 
     </div>
-    """
+""")
+
+@app.route("/projects")
+def projects():
+    if "user_id" not in session:
+        return redirect("/login")
+
+    track = request.args.get("track", "btech")  # default btech
+    user_id = session["user_id"]
+
+    db = get_db()
+
+    projects = db.execute(
+        STMT_PROJECTS_FOR_USER, {"track": track, "user_id": user_id}
+    ).all()
 
-    return render_page(content, "Projects")
+    return render_page(PROJECTS_TEMPLATE.render(projects=projects), "Projects")
 
 
+SKILL_SEARCH_MAX_LEN = 64
+
 def render_btech_skills(search=""):
-    search = (search or "").lower().strip()
+    # cap the free-text filter so an oversized query string can't blow up the scan
+    search = (search or "").lower().strip()[:SKILL_SEARCH_MAX_LEN]
 
-    html = f"""
+    parts = [f"""
     <div class="max-w-7xl mx-auto space-y-12">
 
       <!-- Greeting -->
@@ -997,7 +1350,7 @@ def render_btech_skills(search=""):
             <input
               type="text"
               name="q"
-              value="{search}"
+              value="{escape(search)}"
               placeholder="Search skills, courses, subjects..."
               class="w-full px-6 py-4 rounded-2xl bg-slate-900
                      border border-slate-700 text-white
@@ -1013,7 +1366,7 @@ def render_btech_skills(search=""):
           </div>
         </form>
       </section>
-    """
+    """]
 
     # Branch-wise sections (dynamic)
     for branch, courses in IMPORTANT_BTECH_COURSES.items():
@@ -1026,7 +1379,7 @@ def render_btech_skills(search=""):
         if not filtered:
             continue
 
-        html += f"""
+        parts.append(f"""
         <section>
           <div class="flex justify-between items-center mb-4">
             <h2 class="text-2xl font-semibold">{branch}</h2>
@@ -1037,11 +1390,11 @@ def render_btech_skills(search=""):
           </div>
 
           <div class="grid md:grid-cols-4 gap-5">
-        """
+        """)
 
         for c in filtered[:4]:
             slug = c["slug"]
-            html += f"""
+            parts.append(f"""
             <a href="/skills/btech/course/{slug}"
                class="support-box hover:scale-[1.03] transition">
               <div class="h-32 rounded-lg bg-slate-800
@@ -1053,12 +1406,12 @@ def render_btech_skills(search=""):
 
               <p class="font-semibold text-center">{c['title']}</p>
             </a>
-            """
+            """)
 
-        html += "</div></section>"
+        parts.append("</div></section>")
 
-    html += "</div>"
-    return render_page(html, "BTech Skills")
+    parts.append("</div>")
+    return render_page("".join(parts), "BTech Skills")
 
 @app.route("/skills/btech")
 def btech_skills():
@@ -1075,7 +1428,7 @@ def btech_branch_view(branch):
 
     courses = IMPORTANT_BTECH_COURSES[branch]
 
-    html = f"""
+    parts = [f"""
     <div class="max-w-7xl mx-auto space-y-8">
 
       <div class="flex justify-between items-center">
@@ -1084,10 +1437,10 @@ def btech_branch_view(branch):
       </div>
 
       <div class="grid md:grid-cols-4 gap-6">
-    """
+    """]
 
     for c in courses:
-        html += f"""
+        parts.append(f"""
         <a href="/skills/btech/course/{c['slug']}"
            class="support-box hover:scale-[1.03] transition">
           <div class="h-32 rounded-lg bg-slate-800
@@ -1099,10 +1452,10 @@ def btech_branch_view(branch):
 
           <p class="font-semibold text-center">{c['title']}</p>
         </a>
-        """
+        """)
 
-    html += "</div></div>"
-    return render_page(html, f"{branch} Skills")
+    parts.append("</div></div>")
+    return render_page("".join(parts), f"{branch} Skills")
 
 @app.route("/skills/btech/course/<slug>")
 def btech_course_detail(slug):
@@ -1194,6 +1547,94 @@ def btech_course_detail(slug):
 
 
 # -------------------- COLLEGES --------------------
+# budget <select> value -> fees clause, built once instead of an if/elif chain per request
+BUDGET_FILTERS = {
+    "lt1": College.fees < 100000,
+    "b1_2": College.fees.between(100000, 200000),
+    "b2_3": College.fees.between(200000, 300000),
+    "gt3": College.fees > 300000,
+}
+# (value, label) pairs for the filter <select>s; the template marks the submitted one selected
+BUDGET_OPTS = (
+    ("", "Any budget"),
+    ("lt1", "Below ₹1,00,000"),
+    ("b1_2", "₹1,00,000 – ₹2,00,000"),
+    ("b2_3", "₹2,00,000 – ₹3,00,000"),
+    ("gt3", "Above ₹3,00,000"),
+)
+RATING_OPTS = (
+    ("", "Any rating"),
+    ("3.5", "3.5★ & above"),
+    ("4.0", "4.0★ & above"),
+)
+STMT_COLLEGES_BY_TRACK = (
+    select(College.name, College.course, College.location, College.fees, College.rating)
+    .where(College.track == bindparam("track"))
+    .order_by(College.rating.desc())
+)
+
+COLLEGES_TEMPLATE = app.jinja_env.from_string("""
+    <div class="max-w-6xl mx-auto">
+      <h2 class="text-2xl font-bold mb-3">Colleges - {{ 'BTech' if track == 'btech' else 'Hospitality' }}</h2>
+      <form method="GET" class="mb-3 grid md:grid-cols-3 gap-3 items-center">
+        <input type="hidden" name="track" value="{{ track }}">
+        <select name="budget" class="input-box">
+          {%- for value, label in budget_opts %}
+          <option value="{{ value }}"{% if value == budget %} selected{% endif %}>{{ label }}</option>
+          {%- endfor %}
+        </select>
+        <select name="rating" class="input-box">
+          {%- for value, label in rating_opts %}
+          <option value="{{ value }}"{% if value == rating_min %} selected{% endif %}>{{ label }}</option>
+          {%- endfor %}
+        </select>
+        <input
+          type="number"
+          name="eamcet_rank"
+          placeholder="EAMCET Rank"
+          class="input-box"
+        />
+
+        <button class="px-3 py-2 bg-indigo-600 rounded">Filter</button>
+      </form>
+      <table class="table"><tr><th>College</th><th>Key Course</th><th>Location</th><th>Fees</th><th>Rating</th></tr>
+        {%- for col in colleges -%}
+        <tr><td>{{ col.name }}</td><td>{{ col.course }}</td><td>{{ col.location }}</td><td>₹{{ '{:,}'.format(col.fees) }}</td><td>{{ '%.1f'|format(col.rating) }}★</td></tr>
+        {%- else -%}
+        <tr><td colspan='5'>No colleges match this filter yet.</td></tr>
+        {%- endfor -%}
+      </table>
+      <div class="mt-4"><a href="/" class="px-3 py-1 rounded bg-indigo-600">Back</a></div>
+    </div>
+""")
+
+# one cached page per (track, filter) combination
+@cache.memoize(timeout=300)
+def colleges_content(track, budget, rating_min, eamcet_rank):
+    db = get_db()
+    stmt = STMT_COLLEGES_BY_TRACK
+    budget_filter = BUDGET_FILTERS.get(budget)
+    if budget_filter is not None:
+        stmt = stmt.where(budget_filter)
+    if rating_min:
+        try:
+            rating_val = float(rating_min)
+            stmt = stmt.where(College.rating >= rating_val)
+        except ValueError:
+            pass
+    if track == "btech" and eamcet_rank.isdigit():
+        stmt = stmt.where(College.eamcet_cutoff >= int(eamcet_rank))
+
+    data = db.execute(stmt, {"track": track}).all()
+    return COLLEGES_TEMPLATE.render(
+        track=track,
+        budget=budget,
+        rating_min=rating_min,
+        budget_opts=BUDGET_OPTS,
+        rating_opts=RATING_OPTS,
+        colleges=data,
+    )
+
 @app.route("/colleges")
 def colleges():
     track = request.args.get("track")
@@ -1207,68 +1648,36 @@ def colleges():
           </div>
         </div>
         """
-        return render_page(content, "Colleges")
+        return render_static_page(content, "Colleges")
     # filters retained
     budget = request.args.get("budget", "").strip()
     rating_min = request.args.get("rating", "").strip()
     eamcet_rank = request.args.get("eamcet_rank", "").strip()
 
-    db = get_db()
-    query = db.query(College).filter_by(track=track)
-    if budget == "lt1": query = query.filter(College.fees < 100000)
-    elif budget == "b1_2": query = query.filter(College.fees.between(100000, 200000))
-    elif budget == "b2_3": query = query.filter(College.fees.between(200000, 300000))
-    elif budget == "gt3": query = query.filter(College.fees > 300000)
-    if rating_min:
-        try:
-            rating_val = float(rating_min)
-            query = query.filter(College.rating >= rating_val)
-        except ValueError:
-            pass
-    if track == "btech" and eamcet_rank.isdigit():
-        query = query.filter(College.eamcet_cutoff >= int(eamcet_rank))
-
-    data = query.order_by(College.rating.desc()).all()
-    db.close()
-    rows = ""
-    for col in data:
-        rows += f"<tr><td>{col.name}</td><td>{col.course}</td><td>{col.location}</td><td>₹{col.fees:,}</td><td>{col.rating:.1f}★</td></tr>"
-    if not rows:
-        rows = "<tr><td colspan='5'>No colleges match this filter yet.</td></tr>"
-    sel_any = "selected" if budget == "" else ""
-    content = f"""
-    <div class="max-w-6xl mx-auto">
-      <h2 class="text-2xl font-bold mb-3">Colleges - {'BTech' if track=='btech' else 'Hospitality'}</h2>
-      <form method="GET" class="mb-3 grid md:grid-cols-3 gap-3 items-center">
-        <input type="hidden" name="track" value="{track}">
-        <select name="budget" class="input-box">
-          <option value="" {sel_any}>Any budget</option>
-          <option value="lt1">Below ₹1,00,000</option>
-          <option value="b1_2">₹1,00,000 – ₹2,00,000</option>
-          <option value="b2_3">₹2,00,000 – ₹3,00,000</option>
-          <option value="gt3">Above ₹3,00,000</option>
-        </select>
-        <select name="rating" class="input-box">
-          <option value="">Any rating</option>
-          <option value="3.5">3.5★ & above</option>
-          <option value="4.0">4.0★ & above</option>
-        </select>
-        <input
-          type="number"
-          name="eamcet_rank"
-          placeholder="EAMCET Rank"
-          class="input-box"
-        />
+    return render_page(colleges_content(track, budget, rating_min, eamcet_rank), "Colleges")
 
-        <button class="px-3 py-2 bg-indigo-600 rounded">Filter</button>
-      </form>
-      <table class="table"><tr><th>College</th><th>Key Course</th><th>Location</th><th>Fees</th><th>Rating</th></tr>{rows}</table>
+# -------------------- JOBS --------------------
+STMT_JOBS_BY_TRACK = select(Job.title, Job.company, Job.location, Job.salary).where(
+    Job.track == bindparam("track")
+)
+JOBS_TEMPLATE = app.jinja_env.from_string("""
+    <div class="max-w-4xl mx-auto">
+      <h2 class="text-2xl font-bold mb-3">Jobs & Placements - {{ 'BTech' if track == 'btech' else 'Hospitality' }}</h2>
+      <div class="grid md:grid-cols-2 gap-4">
+        {%- for j in jobs -%}
+        <div class='support-box mb-3'><h3 class='font-semibold'>{{ j.title }}</h3><p class='text-sm text-slate-300'>Company: {{ j.company }} | Location: {{ j.location }}</p><p class='text-sm text-emerald-300 mt-1'>{{ j.salary }}</p></div>
+        {%- endfor -%}
+      </div>
       <div class="mt-4"><a href="/" class="px-3 py-1 rounded bg-indigo-600">Back</a></div>
     </div>
-    """
-    return render_page(content, "Colleges")
+""")
+
+@cache.memoize(timeout=600)
+def jobs_content(track):
+    db = get_db()
+    data = db.execute(STMT_JOBS_BY_TRACK, {"track": track}).all()
+    return JOBS_TEMPLATE.render(track=track, jobs=data)
 
-# -------------------- JOBS --------------------
 @app.route("/jobs")
 def jobs():
     track = request.args.get("track")
@@ -1282,23 +1691,20 @@ def jobs():
           </div>
         </div>
         """
-        return render_page(content, "Jobs")
-    db = get_db()
-    data = db.query(Job).filter_by(track=track).all()
-    db.close()
-    cards = ""
-    for j in data:
-        cards += f"<div class='support-box mb-3'><h3 class='font-semibold'>{j.title}</h3><p class='text-sm text-slate-300'>Company: {j.company} | Location: {j.location}</p><p class='text-sm text-emerald-300 mt-1'>{j.salary}</p></div>"
-    content = f"""
-    <div class="max-w-4xl mx-auto">
-      <h2 class="text-2xl font-bold mb-3">Jobs & Placements - {'BTech' if track=='btech' else 'Hospitality'}</h2>
-      <div class="grid md:grid-cols-2 gap-4">{cards}</div>
-      <div class="mt-4"><a href="/" class="px-3 py-1 rounded bg-indigo-600">Back</a></div>
-    </div>
-    """
-    return render_page(content, "Jobs")
+        return render_static_page(content, "Jobs")
+    return render_page(jobs_content(track), "Jobs")
 
 # -------------------- MENTORSHIP --------------------
+STMT_ALL_MENTORS = select(Mentor.name, Mentor.experience, Mentor.speciality)
+
+MENTOR_CARDS_TEMPLATE = app.jinja_env.from_string("""
+<div class='max-w-4xl mx-auto'><h2 class='text-2xl mb-3'>Mentors</h2><div class='grid md:grid-cols-2 gap-4'>
+{%- for m in mentors -%}
+<div class='support-box mb-3'><h3 class='font-semibold'>{{ m.name }}</h3><p class='text-sm text-slate-300'>{{ m.experience }}</p><p class='text-sm text-indigo-300'>{{ m.speciality }}</p></div>
+{%- endfor -%}
+</div></div>
+""")
+
 @app.route("/mentorship")
 def mentorship():
     user_id = session.get("user_id")
@@ -1312,14 +1718,40 @@ def mentorship():
         """
         return render_page(content, "Mentorship")
     db = get_db()
-    mentors = db.query(Mentor).all()
-    db.close()
-    cards = ""
-    for m in mentors:
-        cards += f"<div class='support-box mb-3'><h3 class='font-semibold'>{m.name}</h3><p class='text-sm text-slate-300'>{m.experience}</p><p class='text-sm text-indigo-300'>{m.speciality}</p></div>"
-    return render_page(f"<div class='max-w-4xl mx-auto'><h2 class='text-2xl mb-3'>Mentors</h2><div class='grid md:grid-cols-2 gap-4'>{cards}</div></div>", "Mentors")
+    mentors = db.execute(STMT_ALL_MENTORS).all()
+    return render_page(MENTOR_CARDS_TEMPLATE.render(mentors=mentors), "Mentors")
 
 # -------------------- MOCK INTERVIEWS (gated) --------------------
+# fetched in batches of 100 while the page streams, rather than all rows up front
+STMT_MOCK_INTERVIEWS = (
+    select(MockInterview.title, MockInterview.notes, MockInterview.uploader_id)
+    .order_by(MockInterview.id.desc())
+    .execution_options(yield_per=100)
+)
+MOCK_INTERVIEWS_TEMPLATE = app.jinja_env.from_string("""
+    <div class="max-w-4xl mx-auto">
+      <h2 class="text-2xl mb-3">Mock Interviews & Practice</h2>
+      <form method="POST" class="mb-4">
+        <input name="title" placeholder="Title" class="input-box mb-2" required>
+        <input name="link" placeholder="Optional link" class="input-box mb-2">
+        <textarea name="notes" rows="3" placeholder="Notes" class="input-box mb-2"></textarea>
+        <button class="submit-btn">Add mock interview</button>
+      </form>
+      <div class="grid md:grid-cols-2 gap-4">
+        {%- for it in items -%}
+        <div class='support-box mb-3'><h3 class='font-semibold'>{{ it.title }}{{ ' (by you)' if user_id and it.uploader_id == user_id else '' }}</h3><p class='text-sm text-slate-300'>{{ it.notes or '' }}</p></div>
+        {%- endfor -%}
+      </div>
+    </div>
+""")
+MOCK_AI_TEMPLATE = app.jinja_env.from_string("""
+<div class='max-w-3xl mx-auto space-y-4'><h1 class='text-2xl font-bold'>AI Mock Interview</h1><div class='bg-slate-900 p-4 rounded h-[320px] overflow-auto'>
+{%- for m in history -%}
+<div class='mb-3'><div class='text-xs text-slate-400'>{{ 'You' if m.role == 'user' else 'Interviewer' }}</div><div class='inline-block px-3 py-2 rounded-2xl {{ 'bg-indigo-600' if m.role == 'user' else 'bg-slate-800' }} text-xs'>{{ m.content }}</div></div>
+{%- endfor -%}
+</div><form method='POST' class='flex gap-2'><input name='message' class='input-box flex-1' placeholder='Type answer or "start"...' required><button class='submit-btn'>Send</button></form></div>
+""")
+
 @app.route("/mock-interviews", methods=["GET", "POST"])
 def mock_interviews():
     user_id = session.get("user_id")
@@ -1334,25 +1766,11 @@ def mock_interviews():
             db.add(MockInterview(title=title, notes=notes, link=link, uploader_id=user_id))
             db.commit()
             return redirect("/mock-interviews")
-    items = db.query(MockInterview).order_by(MockInterview.id.desc()).all()
-    db.close()
-    cards = ""
-    for it in items:
-        uploader = " (by you)" if user_id and it.uploader_id == user_id else ""
-        cards += f"<div class='support-box mb-3'><h3 class='font-semibold'>{it.title}{uploader}</h3><p class='text-sm text-slate-300'>{it.notes or ''}</p></div>"
-    content = f"""
-    <div class="max-w-4xl mx-auto">
-      <h2 class="text-2xl mb-3">Mock Interviews & Practice</h2>
-      <form method="POST" class="mb-4">
-        <input name="title" placeholder="Title" class="input-box mb-2" required>
-        <input name="link" placeholder="Optional link" class="input-box mb-2">
-        <textarea name="notes" rows="3" placeholder="Notes" class="input-box mb-2"></textarea>
-        <button class="submit-btn">Add mock interview</button>
-      </form>
-      <div class="grid md:grid-cols-2 gap-4">{cards}</div>
-    </div>
-    """
-    return render_page(content, "Mock Interviews")
+    # user uploads make this the one list without a fixed size, so it is streamed
+    items = db.execute(STMT_MOCK_INTERVIEWS)
+    return render_page_stream(
+        MOCK_INTERVIEWS_TEMPLATE.generate(items=items, user_id=user_id), "Mock Interviews"
+    )
 
 @app.route("/mock-interviews/ai", methods=["GET","POST"])
 def mock_interview_ai():
@@ -1364,45 +1782,46 @@ def mock_interview_ai():
         user_msg = request.form.get("message","").strip()
         if user_msg:
             history.append({"role":"user","content":user_msg})
-            messages = [{"role":"system","content":"You are an AI mock interviewer. Ask scenario questions, give feedback."}] + history
+            messages = [{"role":"system","content":MOCK_AI_SYSTEM_PROMPT}] + history
             groq_client = get_groq_client()
             if groq_client is None:
                 reply = "AI not configured. Please set GROQ_API_KEY in the server environment."
             else:
                 try:
-                    resp = groq_client.chat.completions.create(model="llama-3.1-8b-instant", messages=messages, temperature=0.7)
-                    reply = resp.choices[0].message.content
+                    reply = cached_completion(groq_client, messages)
                 except Exception as e:
                     reply = f"AI error: {e}"
             history.append({"role":"assistant","content":reply})
+            history = trim_history(history)
             session["mock_ai_history"] = history
-    html = "<div class='max-w-3xl mx-auto space-y-4'><h1 class='text-2xl font-bold'>AI Mock Interview</h1><div class='bg-slate-900 p-4 rounded h-[320px] overflow-auto'>"
-    for m in history:
-        who = "You" if m["role"]=="user" else "Interviewer"
-        cls = "bg-indigo-600" if m["role"]=="user" else "bg-slate-800"
-        html += f"<div class='mb-3'><div class='text-xs text-slate-400'>{who}</div><div class='inline-block px-3 py-2 rounded-2xl {cls} text-xs'>{m['content']}</div></div>"
-    html += "</div><form method='POST' class='flex gap-2'><input name='message' class='input-box flex-1' placeholder='Type answer or \"start\"...' required><button class='submit-btn'>Send</button></form></div>"
-    return render_page(html, "AI Mock Interview")
+    return render_page(MOCK_AI_TEMPLATE.render(history=history), "AI Mock Interview")
 
 # -------------------- Previous Papers (view-only) --------------------
-@app.route("/prev-papers")
-def prev_papers():
-    db = get_db()
-    items = db.query(PrevPaper).order_by(PrevPaper.year.desc()).all()
-    db.close()
-    rows = ""
-    for p in items:
-        link_html = f"<a href='{p.link}' target='_blank' class='text-indigo-300 underline'>Open</a>" if p.link else ""
-        rows += f"<tr><td>{p.title}</td><td>{p.year or ''}</td><td>{link_html}</td></tr>"
-    if not rows:
-        rows = "<tr><td colspan='3'>No papers yet.</td></tr>"
-    content = f"""
+STMT_PREV_PAPERS = select(PrevPaper.title, PrevPaper.year, PrevPaper.link).order_by(
+    PrevPaper.year.desc()
+)
+PREV_PAPERS_TEMPLATE = app.jinja_env.from_string("""
     <div class="max-w-4xl mx-auto">
       <h2 class="text-2xl mb-3">Previous Year Question Papers (view-only)</h2>
-      <table class="table"><tr><th>Title</th><th>Year</th><th>Link</th></tr>{rows}</table>
+      <table class="table"><tr><th>Title</th><th>Year</th><th>Link</th></tr>
+        {%- for p in papers -%}
+        <tr><td>{{ p.title }}</td><td>{{ p.year or '' }}</td><td>{% if p.link %}<a href='{{ p.link }}' target='_blank' class='text-indigo-300 underline'>Open</a>{% endif %}</td></tr>
+        {%- else -%}
+        <tr><td colspan='3'>No papers yet.</td></tr>
+        {%- endfor -%}
+      </table>
     </div>
-    """
-    return render_page(content, "Previous Papers")
+""")
+
+@cache.memoize(timeout=600)
+def prev_papers_content():
+    db = get_db()
+    items = db.execute(STMT_PREV_PAPERS).all()
+    return PREV_PAPERS_TEMPLATE.render(papers=items)
+
+@app.route("/prev-papers")
+def prev_papers():
+    return render_page(prev_papers_content(), "Previous Papers")
 
 # -------------------- AI Career Chat (one free chat) --------------------
 CHATBOT_HTML = """
@@ -1413,7 +1832,7 @@ CHATBOT_HTML = """
   {% else %}
     <p class="text-sm text-slate-300 mb-4">Your free AI career chat is finished. Please subscribe for more guidance (₹499/yr).</p>
   {% endif %}
-  <div class="bg-slate-900 p-4 rounded h-[320px] overflow-auto">
+  <div id="chatLog" class="bg-slate-900 p-4 rounded h-[320px] overflow-auto">
     {% if history %}
       {% for m in history %}
         <div class="mb-3">
@@ -1431,32 +1850,101 @@ CHATBOT_HTML = """
     {% endif %}
   </div>
   {% if not locked %}
-    <form method="POST" class="flex gap-2">
+    <form id="chatForm" method="POST" class="flex gap-2">
       <input name="message" autocomplete="off" placeholder="Type your message..." class="flex-1 input-box" required>
       <button class="px-4 py-2 rounded-full bg-indigo-600 text-sm">Send</button>
     </form>
     <form method="POST" action="/chatbot/end"><button class="mt-2 px-3 py-1 rounded-full border border-rose-500 text-rose-200">End & lock free AI chat</button></form>
+    <script>
+      // stream the reply token-by-token; the plain form POST above still works without JS
+      (function () {
+        const form = document.getElementById('chatForm');
+        const log = document.getElementById('chatLog');
+        function bubble(who, cls) {
+          const wrap = document.createElement('div');
+          wrap.className = 'mb-3';
+          wrap.innerHTML = '<div class="text-xs text-slate-400"></div><div class="inline-block px-3 py-2 rounded-2xl text-xs ' + cls + '"></div>';
+          wrap.firstChild.textContent = who;
+          log.appendChild(wrap);
+          return wrap.lastChild;
+        }
+        form.addEventListener('submit', async function (e) {
+          e.preventDefault();
+          const data = new FormData(form);
+          const resp = await fetch('/chatbot/stream', { method: 'POST', body: data });
+          if (!resp.ok || !resp.body) { form.submit(); return; }
+          if (!log.querySelector('.mb-3')) log.innerHTML = '';
+          bubble('You', 'bg-indigo-600').textContent = data.get('message');
+          const out = bubble('CareerInn AI', 'bg-slate-800');
+          form.reset();
+          const reader = resp.body.getReader();
+          const decoder = new TextDecoder();
+          let buf = '', reply = '', token = null;
+          for (;;) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buf += decoder.decode(value, { stream: true });
+            let idx;
+            while ((idx = buf.indexOf('\\n\\n')) >= 0) {
+              const line = buf.slice(0, idx);
+              buf = buf.slice(idx + 2);
+              if (line.startsWith('event: done\\n')) {
+                token = JSON.parse(line.slice(line.indexOf('data: ') + 6));
+              } else if (line.startsWith('data: ')) {
+                reply += JSON.parse(line.slice(6));
+                out.textContent = reply;
+                log.scrollTop = log.scrollHeight;
+              }
+            }
+          }
+          // the server saves its own signed copy of the reply; nothing is sent on errors
+          if (token) {
+            const done = new FormData();
+            done.append('token', token);
+            await fetch('/chatbot/stream/done', { method: 'POST', body: done });
+          }
+        });
+      })();
+    </script>
   {% else %}
     <p class="text-xs text-slate-400 mt-2">Tip: Subscribe to continue with unlimited AI guidance.</p>
   {% endif %}
 </div>
 """
+CHATBOT_TEMPLATE = app.jinja_env.from_string(CHATBOT_HTML)
+
+def settle_streamed_reply(history):
+    # a streamed turn is normally completed by /chatbot/stream/done; if the client never
+    # confirmed it, try the reply cache, and otherwise drop the unanswered question so
+    # history never holds two user turns in a row
+    if not history or history[-1]["role"] != "user":
+        return history
+    messages = [{"role":"system","content":AI_SYSTEM_PROMPT}] + history
+    reply = cache.get(ai_reply_cache_key(messages))
+    if reply is None:
+        return history[:-1]
+    return trim_history(history + [{"role":"assistant","content":reply}])
+
+def load_chat_history():
+    stored = session.get("ai_history", [])
+    history = settle_streamed_reply(stored)
+    if history is not stored:
+        session["ai_history"] = history
+    return history
 
 @app.route("/chatbot", methods=["GET","POST"])
 def chatbot():
     if "user_id" not in session:
         return redirect("/login")
     user_id = session["user_id"]
-    db = get_db()
-    usage = db.query(AiUsage).filter_by(user_id=user_id).first()
-    locked = bool(usage and usage.ai_used >= 1)
-    db.close()
-    history = session.get("ai_history", [])
+    locked = ai_chat_used(user_id)
+    history = load_chat_history()
     if request.method == "POST":
         if locked:
             history.append({"role":"assistant","content":"Your free AI chat ended. Subscribe for more."})
+            history = trim_history(history)
             session["ai_history"] = history
-            return render_page(render_template_string(CHATBOT_HTML, history=history, locked=True), "CareerInn AI")
+            return render_page(CHATBOT_TEMPLATE.render(history=history, locked=True), "CareerInn AI")
         user_msg = request.form.get("message","").strip()
         if user_msg:
             history.append({"role":"user","content":user_msg})
@@ -1466,13 +1954,103 @@ def chatbot():
                 reply = "AI not configured. Please set GROQ_API_KEY in environment to enable AI responses."
             else:
                 try:
-                    resp = groq_client.chat.completions.create(model="llama-3.1-8b-instant", messages=messages, temperature=0.7)
-                    reply = resp.choices[0].message.content
+                    reply = cached_completion(groq_client, messages)
                 except Exception as e:
                     reply = f"AI error: {e}"
             history.append({"role":"assistant","content":reply})
+            history = trim_history(history)
             session["ai_history"] = history
-    return render_page(render_template_string(CHATBOT_HTML, history=history, locked=locked), "CareerInn AI")
+    return render_page(CHATBOT_TEMPLATE.render(history=history, locked=locked), "CareerInn AI")
+
+def sse_event(text):
+    return f"data: {json.dumps(text)}\n\n"
+
+# the finished streamed reply goes back to the client signed and bound to the user and
+# the turn's cache key, so /chatbot/stream/done can save it on any worker without
+# trusting client-supplied text
+STREAMED_REPLY_SIGNER = URLSafeTimedSerializer(app.secret_key, salt="chatbot-stream-reply")
+STREAMED_REPLY_MAX_AGE = 600
+
+def sse_reply_token(user_id, key, reply):
+    token = STREAMED_REPLY_SIGNER.dumps([user_id, key, reply])
+    return f"event: done\ndata: {json.dumps(token)}\n\n"
+
+@app.route("/chatbot/stream", methods=["POST"])
+def chatbot_stream():
+    # same gate as /chatbot, but the reply is sent as Server-Sent Events as Groq produces it
+    if "user_id" not in session:
+        return Response(status=401)
+    user_id = session["user_id"]
+    if ai_chat_used(user_id):
+        return Response(status=403)
+    user_msg = request.form.get("message","").strip()
+    if not user_msg:
+        return Response(status=400)
+    history = load_chat_history()
+    history.append({"role":"user","content":user_msg})
+    history = trim_history(history)
+    # the cookie is written before the body streams, so the client confirms the reply
+    # with the signed token from the final event (see chatbot_stream_done)
+    session["ai_history"] = history
+    messages = [{"role":"system","content":AI_SYSTEM_PROMPT}] + history
+    key = ai_reply_cache_key(messages)
+    groq_client = get_groq_client()
+
+    def generate():
+        if groq_client is None:
+            yield sse_event("AI not configured. Please set GROQ_API_KEY in environment to enable AI responses.")
+            return
+        cached = get_cached_reply(key)
+        if cached is not None:
+            yield sse_event(cached)
+            yield sse_reply_token(user_id, key, cached)
+            return
+        parts = []
+        try:
+            stream = groq_client.chat.completions.create(model=AI_MODEL, messages=messages, temperature=AI_TEMPERATURE, stream=True)
+            for chunk in stream:
+                # Groq reports usage on the final chunk under x_groq
+                x_groq = getattr(chunk, "x_groq", None)
+                if x_groq is not None:
+                    log_ai_usage(_usage_field(x_groq, "usage"))
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield sse_event(delta)
+        except Exception as e:
+            yield sse_event(f"AI error: {e}")
+            return
+        reply = "".join(parts)
+        cache.set(key, reply, timeout=AI_REPLY_CACHE_TIMEOUT)
+        yield sse_reply_token(user_id, key, reply)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.route("/chatbot/stream/done", methods=["POST"])
+def chatbot_stream_done():
+    if "user_id" not in session:
+        return Response(status=401)
+    try:
+        user_id, key, reply = STREAMED_REPLY_SIGNER.loads(
+            request.form.get("token", ""), max_age=STREAMED_REPLY_MAX_AGE
+        )
+    except BadSignature:
+        return Response(status=400)
+    history = session.get("ai_history", [])
+    # a token only completes the pending turn it was issued for
+    if user_id != session["user_id"] or not history or history[-1]["role"] != "user":
+        return Response(status=409)
+    if ai_reply_cache_key([{"role":"system","content":AI_SYSTEM_PROMPT}] + history) != key:
+        return Response(status=409)
+    history.append({"role":"assistant","content":reply})
+    session["ai_history"] = trim_history(history)
+    return Response(status=204)
 
 @app.route("/chatbot/end", methods=["POST"])
 def chatbot_end():
@@ -1480,18 +2058,46 @@ def chatbot_end():
         return redirect("/login")
     user_id = session["user_id"]
     db = get_db()
-    usage = db.query(AiUsage).filter_by(user_id=user_id).first()
-    if usage is None:
-        usage = AiUsage(user_id=user_id, ai_used=1)
-        db.add(usage)
-    else:
-        usage.ai_used = 1
+    upsert_by_user(db, AiUsage, user_id=user_id, ai_used=1)
     db.commit()
-    db.close()
+    clear_request_cache()
     session["ai_history"] = []
+    session["ai_used"] = True
     return redirect("/chatbot")
 
 # -------------------- AUTH --------------------
+STMT_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+
+# argon2id at the OWASP baseline (19 MiB, 2 passes): far less CPU per login than
+# werkzeug's 600k-iteration pbkdf2 default for comparable strength
+PASSWORD_HASHER = (
+    PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1) if PasswordHasher else None
+)
+
+def hash_password(password):
+    if PASSWORD_HASHER is not None:
+        return PASSWORD_HASHER.hash(password)
+    return generate_password_hash(password, method="pbkdf2:sha256", salt_length=16)
+
+def verify_password(stored, password):
+    """Return (authenticated, needs_rehash) for a stored password of any scheme we've used."""
+    # Case 1: argon2 hash (current scheme)
+    if stored.startswith("$argon2"):
+        if PASSWORD_HASHER is None:
+            return False, False
+        try:
+            PASSWORD_HASHER.verify(stored, password)
+        except (VerificationError, InvalidHashError):
+            return False, False
+        return True, PASSWORD_HASHER.check_needs_rehash(stored)
+    # Case 2: pbkdf2 hash from before argon2
+    if stored.startswith("pbkdf2:"):
+        ok = check_password_hash(stored, password)
+        return ok, ok and PASSWORD_HASHER is not None
+    # Case 3: old plain-text password, compared in constant time
+    ok = hmac.compare_digest(stored.encode(), password.encode())
+    return ok, ok
+
 SIGNUP_FORM = """
 <form method="POST" class="max-w-md mx-auto space-y-3">
   <h2 class="text-xl font-bold">Create account</h2>
@@ -1513,6 +2119,14 @@ LOGIN_FORM = """
 </form>
 """
 
+# error variants are concatenated once here rather than on every failed POST
+def form_error(message):
+    return f"<p class='text-red-400'>{message}</p>"
+
+SIGNUP_FORM_MISSING_FIELDS = form_error("All fields required.") + SIGNUP_FORM
+LOGIN_FORM_EMAIL_EXISTS = form_error("Email exists. Login instead.") + LOGIN_FORM
+LOGIN_FORM_INVALID = form_error("Invalid credentials.") + LOGIN_FORM
+
 @app.route("/signup", methods=["GET","POST"])
 def signup():
     if request.method == "POST":
@@ -1520,15 +2134,13 @@ def signup():
         email = request.form.get("email","").strip().lower()
         password = request.form.get("password","").strip()
         if not name or not email or not password:
-            return render_page("<p class='text-red-400'>All fields required.</p>" + SIGNUP_FORM)
+            return render_page(SIGNUP_FORM_MISSING_FIELDS)
         db = get_db()
-        if db.query(User).filter(User.email==email).first():
-            db.close()
-            return render_page("<p class='text-red-400'>Email exists. Login instead.</p>" + LOGIN_FORM)
-        hashed = generate_password_hash(password, method="pbkdf2:sha256", salt_length=16)
+        if db.execute(STMT_USER_BY_EMAIL, {"email": email}).scalar():
+            return render_page(LOGIN_FORM_EMAIL_EXISTS)
+        hashed = hash_password(password)
         db.add(User(name=name, email=email, password=hashed))
         db.commit()
-        db.close()
         return redirect("/login")
     return render_page(SIGNUP_FORM)
 
@@ -1557,10 +2169,8 @@ def onboarding():
         profile.onboarded = True
 
         db.commit()
-        db.close()
         return redirect("/home")
 
-    db.close()
 
     content = """
     <div class="max-w-4xl mx-auto space-y-6">
@@ -1653,24 +2263,15 @@ def login():
         email = request.form.get("email","").strip().lower()
         password = request.form.get("password","").strip()
         db = get_db()
-        user = db.query(User).filter(User.email==email).first()
+        user = db.execute(STMT_USER_BY_EMAIL, {"email": email}).scalar()
         authenticated = False
 
         if user:
-            # Case 1: password is hashed (normal case)
-            if user.password.startswith("pbkdf2:"):
-                authenticated = check_password_hash(user.password, password)
-        
-            # Case 2: old plain-text password (auto-fix)
-            elif user.password == password:
-                authenticated = True
-        
-                # 🔒 auto-upgrade to hashed password
-                user.password = generate_password_hash(
-                    password,
-                    method="pbkdf2:sha256",
-                    salt_length=16
-                )
+            authenticated, needs_rehash = verify_password(user.password, password)
+
+            # 🔒 auto-upgrade plain-text / older hashes to the current scheme
+            if needs_rehash:
+                user.password = hash_password(password)
                 db.commit()
 
 
@@ -1678,6 +2279,8 @@ def login():
             session["user"] = user.name
             session["user_id"] = user.id
             session["ai_history"] = []
+            session.pop("ai_used", None)
+            session.pop("is_subscribed", None)
             session["first_time_login"] = True
 
             # ✅ GUARANTEE profile exists (FIX)
@@ -1687,19 +2290,13 @@ def login():
                 db.add(profile)
                 db.commit()
             
-            # 🔒 SAVE VALUE BEFORE CLOSING SESSION
-            is_onboarded = profile.onboarded
-            
-            db.close()
-            
-            if not is_onboarded:
+            if not profile.onboarded:
                 return redirect("/onboarding")
 
 
             return redirect("/home")
 
-        db.close()
-        return render_page("<p class='text-red-400'>Invalid credentials.</p>" + LOGIN_FORM)
+        return render_page(LOGIN_FORM_INVALID)
 
     return render_page(LOGIN_FORM)
 
@@ -1715,18 +2312,13 @@ def subscribe():
     if "user_id" not in session:
         return redirect("/login")
     user_id = session["user_id"]
-    db = get_db()
-    sub = db.query(Subscription).filter_by(user_id=user_id).first()
     if request.method == "POST":
-        if not sub:
-            sub = Subscription(user_id=user_id, active=True)
-            db.add(sub)
-        else:
-            sub.active = True
+        db = get_db()
+        upsert_by_user(db, Subscription, user_id=user_id, active=True)
         db.commit()
-        db.close()
+        session["is_subscribed"] = True
+        clear_request_cache()
         return redirect("/dashboard")
-    db.close()
     content = """
     <div class="max-w-md mx-auto">
       <h2 class="text-2xl font-bold mb-3">Subscribe — Student Pass ₹499 / year</h2>
@@ -1737,131 +2329,187 @@ def subscribe():
     return render_page(content, "Subscribe")
 
 # -------------------- DASHBOARD --------------------
-@app.route("/dashboard", methods=["GET","POST"])
-def dashboard():
-    if "user_id" not in session:
-        return redirect("/login")
-    user_id = session["user_id"]
-    user_name = session["user"]
-    tab = request.args.get("tab", "home")
-    db = get_db()
-    profile = db.query(UserProfile).filter_by(user_id=user_id).first()
-    if profile is None:
-        profile = UserProfile(user_id=user_id)
-        db.add(profile)
-        db.commit()
-    # handle skills/resume saving
-    if request.method == "POST":
-        if request.form.get("tab") == "skills":
-            if not user_is_subscribed(user_id):
-                db.close()
-                return redirect("/dashboard?tab=skills")
-            profile.skills_text = request.form.get("skills_text","").strip()
-            profile.target_roles = request.form.get("target_roles","").strip()
-            try:
-                profile.self_rating = int(request.form.get("self_rating","0"))
-            except ValueError:
-                profile.self_rating = 0
-            db.commit()
-            db.close()
-            return redirect("/dashboard?tab=skills")
-        if request.form.get("tab") == "resume":
-            profile.resume_link = request.form.get("resume_link","").strip()
-            profile.notes = request.form.get("notes","").strip()
-            db.commit()
-            db.close()
-            return redirect("/dashboard?tab=resume")
-    db.close()
-    greeting = "Welcome back 👋" if not session.get("first_time_login", False) else "CareerInn-Tech welcomes you 🎉"
-    session["first_time_login"] = False
-    # quick panels
-    skills_text = profile.skills_text or ""
-    if not skills_text and user_is_subscribed(user_id):
-        skills_text = "Communication, Problem-solving, Teamwork, Domain fundamentals"
-    # assemble panels
-    home_panel = f"""
+# profile + subscription flag in one round trip instead of two separate lookups; driven
+# from users so the flag is known even before the user has a profile row
+STMT_DASHBOARD_STATE = (
+    select(UserProfile, Subscription.active)
+    .select_from(User)
+    .outerjoin(UserProfile, UserProfile.user_id == User.id)
+    .outerjoin(Subscription, Subscription.user_id == User.id)
+    .where(User.id == bindparam("user_id"))
+)
+
+# per-user panels compiled once at import; profile text is autoescaped on render
+DASHBOARD_HOME_TEMPLATE = app.jinja_env.from_string("""
     <div class="space-y-4">
-      <h2 class="text-2xl font-bold">{greeting}, {user_name}</h2>
+      <h2 class="text-2xl font-bold">{{ greeting }}, {{ user_name }}</h2>
       <p class="text-sm text-slate-300">Your student workspace. Edit skills, add resume link, and prepare for interviews.</p>
       <div class="grid md:grid-cols-3 gap-4 mt-4">
         <div class="support-box"><p class="text-xs">Readiness</p><p class="text-2xl font-bold">--/5</p></div>
         <div class="support-box"><p class="text-xs">Target roles</p><p class="text-2xl font-bold">--</p></div>
-        <div class="support-box"><p class="text-xs">Resume</p><p class="text-2xl font-bold">{ 'Yes' if profile.resume_link else 'No' }</p></div>
+        <div class="support-box"><p class="text-xs">Resume</p><p class="text-2xl font-bold">{{ 'Yes' if profile.resume_link else 'No' }}</p></div>
       </div>
-      <div class="mt-4 support-box"><h3 class="font-semibold">Top Skills</h3><p class="text-sm text-slate-300 mt-2">{skills_text}</p><div class="mt-2"><a href="/dashboard?tab=skills" class="px-3 py-1 rounded bg-indigo-600">Edit skills</a></div></div>
+      <div class="mt-4 support-box"><h3 class="font-semibold">Top Skills</h3><p class="text-sm text-slate-300 mt-2">{{ skills_text }}</p><div class="mt-2"><a href="/dashboard?tab=skills" class="px-3 py-1 rounded bg-indigo-600">Edit skills</a></div></div>
     </div>
-    """
-    skills_panel = f"""
+""")
+DASHBOARD_SKILLS_TEMPLATE = app.jinja_env.from_string("""
     <div class="space-y-4">
       <h2 class="text-2xl font-bold">Skills & Strengths</h2>
       <p class="text-sm text-slate-300">Add skills that matter for your track.</p>
       <form method="POST">
         <input type="hidden" name="tab" value="skills">
-        <textarea name="skills_text" rows="4" class="input-box mb-2">{profile.skills_text or ''}</textarea>
-        <input name="target_roles" placeholder="Target roles (comma separated)" class="input-box mb-2" value="{profile.target_roles or ''}">
-        <input name="self_rating" type="number" min="0" max="5" class="input-box mb-2" value="{profile.self_rating or 0}">
+        <textarea name="skills_text" rows="4" class="input-box mb-2">{{ profile.skills_text or '' }}</textarea>
+        <input name="target_roles" placeholder="Target roles (comma separated)" class="input-box mb-2" value="{{ profile.target_roles or '' }}">
+        <input name="self_rating" type="number" min="0" max="5" class="input-box mb-2" value="{{ profile.self_rating or 0 }}">
         <button class="submit-btn">Save skills</button>
       </form>
     </div>
-    """
-    resume_panel = f"""
+""")
+DASHBOARD_RESUME_TEMPLATE = app.jinja_env.from_string("""
     <div class="space-y-4">
       <h2 class="text-2xl font-bold">Resume & Notes</h2>
       <form method="POST">
         <input type="hidden" name="tab" value="resume">
-        <input name="resume_link" placeholder="Resume link" class="input-box mb-2" value="{profile.resume_link or ''}">
-        <textarea name="notes" rows="3" class="input-box mb-2">{profile.notes or ''}</textarea>
+        <input name="resume_link" placeholder="Resume link" class="input-box mb-2" value="{{ profile.resume_link or '' }}">
+        <textarea name="notes" rows="3" class="input-box mb-2">{{ profile.notes or '' }}</textarea>
         <button class="submit-btn">Save</button>
       </form>
     </div>
-    """
-    mentors_panel = "<div class='space-y-4'><h2 class='text-2xl font-bold'>Mentorship</h2><p class='text-sm text-slate-300'>Connect with mentors — subscribe to unlock booking.</p></div>"
-    faqs_panel = "<div class='space-y-4'><h2 class='text-2xl font-bold'>FAQs</h2><p class='text-sm text-slate-300'>Demo app & sample data.</p></div>"
-    panel_html = home_panel if tab=="home" else (skills_panel if tab=="skills" else (resume_panel if tab=="resume" else (mentors_panel if tab=="mentors" else faqs_panel)))
-    # sidebar tabs
-    def cls(name):
-        return "block w-full text-left px-3 py-2 rounded-lg bg-indigo-600 text-white" if tab==name else "block w-full text-left px-3 py-2 rounded-lg text-slate-300 hover:bg-slate-800"
-    content = f"""
+""")
+
+# dashboard panels with no per-user data
+MENTORS_PANEL = "<div class='space-y-4'><h2 class='text-2xl font-bold'>Mentorship</h2><p class='text-sm text-slate-300'>Connect with mentors — subscribe to unlock booking.</p></div>"
+FAQS_PANEL = "<div class='space-y-4'><h2 class='text-2xl font-bold'>FAQs</h2><p class='text-sm text-slate-300'>Demo app & sample data.</p></div>"
+
+def build_home_panel(ctx):
+    skills_text = ctx["profile"].skills_text or ""
+    if not skills_text and user_is_subscribed(ctx["user_id"]):
+        skills_text = "Communication, Problem-solving, Teamwork, Domain fundamentals"
+    return DASHBOARD_HOME_TEMPLATE.render(skills_text=skills_text, **ctx)
+
+def build_skills_panel(ctx):
+    return DASHBOARD_SKILLS_TEMPLATE.render(profile=ctx["profile"])
+
+def build_resume_panel(ctx):
+    return DASHBOARD_RESUME_TEMPLATE.render(profile=ctx["profile"])
+
+def build_mentors_panel(ctx):
+    return MENTORS_PANEL
+
+def build_faqs_panel(ctx):
+    return FAQS_PANEL
+
+DASHBOARD_PANELS = {
+    "home": build_home_panel,
+    "skills": build_skills_panel,
+    "resume": build_resume_panel,
+    "mentors": build_mentors_panel,
+}
+
+# sidebar tabs that switch the panel in place; the rest of the nav links out
+DASHBOARD_NAV_TABS = (("home", "🏠 Home"), ("skills", "⭐ Skills"), ("resume", "📄 Resume"))
+ACTIVE_TAB_CLS = "block w-full text-left px-3 py-2 rounded-lg bg-indigo-600 text-white"
+INACTIVE_TAB_CLS = "block w-full text-left px-3 py-2 rounded-lg text-slate-300 hover:bg-slate-800"
+
+def _render_dashboard_nav(active_tab):
+    return "".join(
+        f'<a href="/dashboard?tab={key}" class="{ACTIVE_TAB_CLS if key == active_tab else INACTIVE_TAB_CLS}">{label}</a>'
+        for key, label in DASHBOARD_NAV_TABS
+    )
+
+# the nav only varies by which tab is highlighted, so every variant is built once here;
+# tabs without a nav link (mentors, faqs, unknown) highlight nothing
+DASHBOARD_NAV_HTML = {key: _render_dashboard_nav(key) for key, _ in DASHBOARD_NAV_TABS}
+DASHBOARD_NAV_HTML_NONE = _render_dashboard_nav(None)
+
+# dashboard shell around the selected panel; nav_html and panel_html are rendered markup
+DASHBOARD_LAYOUT_TEMPLATE = app.jinja_env.from_string("""
     <div class="max-w-6xl mx-auto">
       <div class="mb-4"><h1 class="text-2xl font-bold">Student Dashboard</h1></div>
       <div class="grid md:grid-cols-[220px,1fr] gap-6">
         <aside class="bg-slate-900 p-4 rounded-2xl">
           <nav class="flex flex-col gap-2">
-            <a href="/dashboard?tab=home" class="{cls('home')}">🏠 Home</a>
-            <a href="/dashboard?tab=skills" class="{cls('skills')}">⭐ Skills</a>
-            <a href="/dashboard?tab=resume" class="{cls('resume')}">📄 Resume</a>
+            {{ nav_html|safe }}
             <a href="/mentorship" class="block px-3 py-2 rounded-lg text-slate-300 hover:bg-slate-800">🧑‍🏫 Mentorship</a>
             <a href="/mock-interviews" class="block px-3 py-2 rounded-lg text-slate-300 hover:bg-slate-800">🎤 Mock Interviews</a>
             <a href="/prev-papers" class="block px-3 py-2 rounded-lg text-slate-300 hover:bg-slate-800">📚 Question Papers</a>
           </nav>
         </aside>
-        <section class="bg-slate-900 p-6 rounded-2xl">{panel_html}</section>
+        <section class="bg-slate-900 p-6 rounded-2xl">{{ panel_html|safe }}</section>
       </div>
     </div>
-    """
-    return render_page(content, "Dashboard")
+""")
 
-# -------------------- PROFILE --------------------
-@app.route("/profile")
-def profile():
+def dashboard_etag(*state):
+    # ASSET_VERSION changes per deploy, so new markup never matches an old tag
+    return hashlib.blake2b(repr((ASSET_VERSION, *state)).encode(), digest_size=8).hexdigest()
+
+def etag_matches(etag):
+    # Flask-Compress suffixes the tag it sends (e.g. "abc:gzip"), so compare the base tag
+    return any(tag.split(":", 1)[0] == etag for tag in request.if_none_match.as_set())
+
+@app.route("/dashboard", methods=["GET","POST"])
+def dashboard():
     if "user_id" not in session:
         return redirect("/login")
-
-    user_id = session["user_id"]   # ✅ FIX 1
+    user_id = session["user_id"]
     user_name = session["user"]
-
+    tab = request.args.get("tab", "home")
     db = get_db()
-    profile = db.query(UserProfile).filter_by(user_id=user_id).first()
-    db.close()
-
-    # ✅ SAFE FALLBACKS
-    notes = profile.notes if profile and profile.notes else "Not specified"
-    skills = profile.skills_text if profile and profile.skills_text else "No skills added yet"
-    targets = profile.target_roles if profile and profile.target_roles else "—"
-    resume = profile.resume_link if profile and profile.resume_link else "—"
-    rating = profile.self_rating if profile and profile.self_rating else "—"
+    profile, active = db.execute(STMT_DASHBOARD_STATE, {"user_id": user_id}).first() or (None, None)
+    # prime the per-request cache so user_is_subscribed() below doesn't re-query
+    prime_request_cache(("sub", user_id), active)
+    is_new_profile = profile is None
+    if is_new_profile:
+        # render from a blank profile; it is only INSERTed if a POST below saves into it
+        profile = UserProfile(user_id=user_id)
+    else:
+        prime_request_cache(("prof", user_id), profile)
+    # handle skills/resume saving: one UPDATE (or INSERT) and one commit per POST
+    if request.method == "POST":
+        if is_new_profile:
+            db.add(profile)
+        if request.form.get("tab") == "skills":
+            if not user_is_subscribed(user_id):
+                return redirect("/dashboard?tab=skills")
+            profile.skills_text = request.form.get("skills_text","").strip()
+            profile.target_roles = request.form.get("target_roles","").strip()
+            try:
+                # clamp on write so every reader can trust the stored 0-5 value
+                profile.self_rating = max(0, min(5, int(request.form.get("self_rating","0"))))
+            except ValueError:
+                profile.self_rating = 0
+            db.commit()
+            return redirect("/dashboard?tab=skills")
+        if request.form.get("tab") == "resume":
+            profile.resume_link = request.form.get("resume_link","").strip()
+            profile.notes = request.form.get("notes","").strip()
+            db.commit()
+            return redirect("/dashboard?tab=resume")
+    greeting = "Welcome back 👋" if not session.get("first_time_login", False) else "CareerInn-Tech welcomes you 🎉"
+    session["first_time_login"] = False
+    # the page is a pure function of these values, so a matching ETag skips the render
+    etag = dashboard_etag(
+        user_name, tab, greeting, active, profile.skills_text, profile.target_roles,
+        profile.self_rating, profile.resume_link, profile.notes,
+    )
+    if etag_matches(etag):
+        not_modified = Response(status=304)
+        not_modified.set_etag(etag)
+        return not_modified
+    # only the selected tab's panel is built
+    ctx = {"user_id": user_id, "user_name": user_name, "greeting": greeting, "profile": profile}
+    panel_html = DASHBOARD_PANELS.get(tab, build_faqs_panel)(ctx)
+    content = DASHBOARD_LAYOUT_TEMPLATE.render(
+        nav_html=DASHBOARD_NAV_HTML.get(tab, DASHBOARD_NAV_HTML_NONE), panel_html=panel_html
+    )
+    resp = make_response(render_page(content, "Dashboard"))
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
 
-    content = f"""
+# -------------------- PROFILE --------------------
+PROFILE_TEMPLATE = app.jinja_env.from_string("""
     <div class="max-w-4xl mx-auto space-y-6">
 
       <h1 class="text-2xl font-bold">My Profile</h1>
@@ -1869,42 +2517,63 @@ def profile():
       <!-- BASIC INFO -->
       <div class="support-box">
         <h3 class="font-semibold mb-2">Basic Information</h3>
-        <p><b>Name:</b> {user_name}</p>
+        <p><b>Name:</b> {{ user_name }}</p>
       </div>
 
       <!-- REGISTRATION DETAILS -->
       <div class="support-box">
         <h3 class="font-semibold mb-2">Registration Details</h3>
-        <p class="text-sm text-slate-300">{notes}</p>
+        <p class="text-sm text-slate-300">{{ profile.notes or 'Not specified' if profile else 'Not specified' }}</p>
       </div>
 
       <!-- SKILLS -->
       <div class="support-box">
         <h3 class="font-semibold mb-2">Skills</h3>
-        <p class="text-sm text-slate-300">{skills}</p>
+        <p class="text-sm text-slate-300">{{ profile.skills_text or 'No skills added yet' if profile else 'No skills added yet' }}</p>
       </div>
 
       <!-- TARGET ROLES -->
       <div class="support-box">
         <h3 class="font-semibold mb-2">Target Roles</h3>
-        <p class="text-sm text-slate-300">{targets}</p>
+        <p class="text-sm text-slate-300">{{ profile.target_roles or '—' if profile else '—' }}</p>
       </div>
 
       <!-- RESUME -->
       <div class="support-box">
         <h3 class="font-semibold mb-2">Resume</h3>
-        <p class="text-sm text-slate-300">{resume}</p>
+        <p class="text-sm text-slate-300">
+          {%- if resume_href -%}
+          <a href="{{ resume_href }}" target="_blank" rel="noopener" class="underline">{{ resume_href }}</a>
+          {%- else -%}
+          {{ profile.resume_link or '—' if profile else '—' }}
+          {%- endif -%}
+        </p>
       </div>
 
       <!-- SELF RATING -->
       <div class="support-box">
         <h3 class="font-semibold mb-2">Self Rating</h3>
-        <p class="text-sm text-slate-300">{rating} / 5</p>
+        <p class="text-sm text-slate-300">{{ profile.self_rating or '—' if profile else '—' }} / 5</p>
       </div>
 
     </div>
-    """
+""")
+
+@app.route("/profile")
+def profile():
+    if "user_id" not in session:
+        return redirect("/login")
+
+    user_id = session["user_id"]   # ✅ FIX 1
+    user_name = session["user"]
+
+    db = get_db()
+    profile = db.query(UserProfile).filter_by(user_id=user_id).first()
 
+    # only http(s) links become clickable, so a stored "javascript:" URL stays inert text
+    resume_link = (profile.resume_link or "").strip() if profile else ""
+    resume_href = resume_link if resume_link.lower().startswith(("http://", "https://")) else None
+    content = PROFILE_TEMPLATE.render(user_name=user_name, profile=profile, resume_href=resume_href)
     return render_page(content, "Profile")
 
 
@@ -1915,5 +2584,10 @@ def uploaded_file(filename):
 
 # -------------------- RUN --------------------
 if __name__ == "__main__":
-    # default host/port for local dev
-    app.run(debug=True, host="0.0.0.0", port=int(os.environ.get("PORT", 5000)))
+    # local dev server; production runs under gunicorn (see Procfile). FLASK_DEBUG=1 enables the reloader/debugger
+    app.run(
+        debug=os.environ.get("FLASK_DEBUG") == "1",
+        threaded=True,
+        host="0.0.0.0",
+        port=int(os.environ.get("PORT", 5000)),
+    )
@@ -0,0 +1,6 @@
+const aiFab = document.getElementById('aiFab');
+const aiModal = document.getElementById('aiModal');
+const closeAi = document.getElementById('closeAi');
+aiFab.addEventListener('click', ()=> aiModal.style.display = 'block');
+closeAi.addEventListener('click', ()=> aiModal.style.display = 'none');
+window.addEventListener('click', (e)=> { if(e.target === aiModal) aiModal.style.display='none'; });